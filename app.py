@@ -1,6 +1,6 @@
 import os
 import streamlit as st
-from rag import RAGChatbot
+from rag import RAGChatbot, ConversationMemory
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -102,13 +102,24 @@ html, body, [class*="css"] {
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def load_chatbot():
+    # One chatbot for all sessions, so concurrent questions share the
+    # embedding model's micro-batching queue
+    chatbot = RAGChatbot()
+    chatbot.start_watcher("./documents")
+    return chatbot
+
 if 'chatbot' not in st.session_state:
     with st.spinner("Loading..."):
-        st.session_state.chatbot = RAGChatbot()
+        st.session_state.chatbot = load_chatbot()
 
 if 'messages' not in st.session_state:
     st.session_state.messages = []
 
+if 'memory' not in st.session_state:
+    st.session_state.memory = ConversationMemory()
+
 with st.sidebar:
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown("#### Filters")
@@ -133,6 +144,17 @@ with st.sidebar:
     
     st.markdown("</div>", unsafe_allow_html=True)
 
+    if st.session_state.chatbot.watcher is not None:
+        metrics = st.session_state.chatbot.watcher.metrics()
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.markdown("#### Indexing")
+        st.markdown(
+            f"<small style='color:#9aa4b2;'>Queue: {metrics['queue_depth']} files · "
+            f"Lag: {metrics['lag_seconds']:.0f}s · Indexed: {metrics['processed']}</small>",
+            unsafe_allow_html=True
+        )
+        st.markdown("</div>", unsafe_allow_html=True)
+
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown("#### About")
     st.markdown("• 30 curated documents  \n• 1,400+ chunks indexed  \n• Finance, Healthcare, Supply Chain")
@@ -192,7 +214,8 @@ if send and user_input:
         result = st.session_state.chatbot.ask(
             user_input, 
             n_results=5,
-            categories=categories if categories else None
+            categories=categories if categories else None,
+            memory=st.session_state.memory
         )
         st.session_state.messages.append({
             "role":"assistant",
@@ -0,0 +1,105 @@
+"""
+Benchmark for embedding micro-batching
+
+Fires concurrent embed_text calls from several threads and reports
+throughput and latency for each batch window / batch size setting.
+
+Usage:
+    python3 benchmark_batching.py --clients 16 --requests 20
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from rag.batching import MicroBatcher
+from rag.embeddings import EmbeddingModel
+
+
+SAMPLE_QUERIES = [
+    "What are pharmaceutical services in primary healthcare?",
+    "How does health insurance coverage work?",
+    "What are the phases of clinical trials?",
+    "How are insurance premiums calculated?",
+    "What is the role of pharmacists in patient care?",
+    "How do drug prices affect medication adherence?",
+]
+
+
+def run_setting(model: EmbeddingModel, clients: int, requests_per_client: int):
+    latencies = []
+    lock = threading.Lock()
+
+    def client(client_id: int):
+        local = []
+        for i in range(requests_per_client):
+            query = SAMPLE_QUERIES[(client_id + i) % len(SAMPLE_QUERIES)]
+            start = time.perf_counter()
+            model.embed_text(query)
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'throughput': len(latencies) / elapsed,
+        'p50': statistics.median(latencies),
+        'p95': latencies[max(int(len(latencies) * 0.95) - 1, 0)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding micro-batching")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--windows", type=float, nargs="+", default=[0.0, 2.0, 5.0, 10.0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32])
+    args = parser.parse_args()
+
+    settings = [("no batching", None, None)]
+    for size in args.batch_sizes:
+        for window in args.windows:
+            settings.append((f"window={window}ms size={size}", window, size))
+
+    print(f"\n{args.clients} clients x {args.requests} requests")
+    print("-" * 72)
+    print(f"{'setting':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'avg batch':>12}")
+    print("-" * 72)
+
+    model = EmbeddingModel(micro_batching=False)
+    model.embed_text("warm up")
+
+    for label, window, size in settings:
+        model.close()
+        if window is not None:
+            model.batcher = MicroBatcher(
+                model._encode_queries,
+                max_batch_size=size,
+                batch_window_ms=window
+            )
+
+        result = run_setting(model, args.clients, args.requests)
+
+        avg_batch = 1.0
+        if model.batcher is not None:
+            stats = model.batcher.stats
+            avg_batch = stats['requests'] / max(stats['batches'], 1)
+
+        print(f"{label:<28}{result['throughput']:>10.1f}{result['p50']:>10.1f}"
+              f"{result['p95']:>10.1f}{avg_batch:>12.1f}")
+
+    model.close()
+    print("-" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark for quantized vector storage
+
+Builds a quantized copy of the Chroma collection and reports its memory
+footprint and recall@k against exact float32 search.
+
+Usage:
+    python3 benchmark_quantization.py --mode int8 --k 5
+"""
+
+import argparse
+
+from rag.embeddings import EmbeddingModel
+from rag.vector_store import VectorStore
+from rag.quantized_store import QuantizedVectorStore
+
+
+SAMPLE_QUERIES = [
+    "What are pharmaceutical services in primary healthcare?",
+    "How does health insurance coverage work?",
+    "What are the phases of clinical trials?",
+    "How are insurance premiums calculated?",
+    "What is the role of pharmacists in patient care?",
+    "How do drug prices affect medication adherence?",
+    "What factors influence health insurance enrollment?",
+    "How is medication safety monitored?",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized vector storage")
+    parser.add_argument("--mode", choices=QuantizedVectorStore.MODES, default="int8")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--persist-directory", default="./quantized_db")
+    args = parser.parse_args()
+
+    store = QuantizedVectorStore.from_vector_store(
+        VectorStore(),
+        persist_directory=args.persist_directory,
+        mode=args.mode
+    )
+
+    model = EmbeddingModel(micro_batching=False)
+    queries = [model.embed_text(q) for q in SAMPLE_QUERIES]
+
+    footprint = store.memory_footprint()
+    recall = store.evaluate_recall(queries, k=args.k)
+
+    print("\nMemory footprint")
+    print("-" * 60)
+    for key, value in footprint.items():
+        if key.endswith("_bytes"):
+            print(f"  {key:<28}{value / 1024 / 1024:>10.2f} MB")
+        else:
+            print(f"  {key:<28}{value:>10}")
+
+    print(f"\nRecall@{args.k} vs exact float32 ({recall['queries']} queries)")
+    print("-" * 60)
+    print(f"  {'first pass only':<28}{recall['first_pass_recall']:>10.3f}")
+    print(f"  {'with float32 re-scoring':<28}{recall['rescored_recall']:>10.3f}")
+
+    model.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
 from .document_loader import DocumentLoader, Document
 from .chunker import TextChunker
 from .embeddings import EmbeddingModel
+from .batching import MicroBatcher
 from .vector_store import VectorStore
+from .quantized_store import QuantizedVectorStore
+from .keyword_index import KeywordIndex
 from .retriever import HybridRetriever
+from .sharding import ShardedRetriever
+from .router import QueryRouter
 from .generator import AnswerGenerator
+from .watcher import DocumentWatcher
+from .conversation import ConversationMemory
 from .chatbot import RAGChatbot
 
 __all__ = [
@@ -11,8 +18,15 @@ __all__ = [
     'Document',
     'TextChunker',
     'EmbeddingModel',
+    'MicroBatcher',
     'VectorStore',
+    'QuantizedVectorStore',
+    'KeywordIndex',
     'HybridRetriever',
+    'ShardedRetriever',
+    'QueryRouter',
     'AnswerGenerator',
+    'DocumentWatcher',
+    'ConversationMemory',
     'RAGChatbot',
 ]
@@ -1,15 +1,28 @@
+import os
+import time
 from typing import Dict, Any, List
 from .embeddings import EmbeddingModel
 from .vector_store import VectorStore
+from .quantized_store import QuantizedVectorStore
 from .retriever import HybridRetriever
+from .sharding import ShardedRetriever
 from .generator import AnswerGenerator
 from .document_loader import DocumentLoader
 from .chunker import TextChunker
+from .watcher import DocumentWatcher
+from .router import QueryRouter
+from .conversation import ConversationMemory
 
 
 class RAGChatbot:
     
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        quantization: str = None,
+        shard_by: str = None,
+        num_shards: int = 4
+    ):
 
         print("Initializing RAG Chatbot...")
         print("-" * 60)
@@ -19,58 +32,192 @@ class RAGChatbot:
         
         print("Loading vector database...")
         self.vector_store = VectorStore()
+        self.chroma_store = chroma_store = self.vector_store
         
-        print("Loading documents for keyword search...")
-        loader = DocumentLoader()
-        docs = loader.load_directory("./documents")
-        chunker = TextChunker()
-        self.chunks = chunker.chunk_documents(docs)
-        
-        print("Initializing hybrid retriever...")
-        self.retriever = HybridRetriever(
-            self.vector_store,
-            self.embedding_model,
-            self.chunks
-        )
+        if quantization:
+            print(f"Loading {quantization} quantized index...")
+            try:
+                quantized_store = QuantizedVectorStore(mode=quantization)
+            except ValueError:
+                # Index on disk was built in the other mode
+                quantized_store = None
+            if quantized_store is None or quantized_store.get_count() != self.vector_store.get_count():
+                quantized_store = QuantizedVectorStore.from_vector_store(
+                    chroma_store,
+                    mode=quantization
+                )
+            self.vector_store = quantized_store
+        
+        if shard_by:
+            print(f"Initializing sharded retriever ({shard_by})...")
+            self.chunks = []
+            self.retriever = ShardedRetriever(
+                self.embedding_model,
+                num_shards=num_shards,
+                shard_by=shard_by
+            )
+            if self.retriever.get_count() == 0:
+                self.retriever.build_from_vector_store(chroma_store)
+        else:
+            print("Loading documents for keyword search...")
+            loader = DocumentLoader()
+            docs = loader.load_directory("./documents")
+            chunker = TextChunker()
+            self.chunks = chunker.chunk_documents(docs)
+            
+            print("Initializing hybrid retriever...")
+            self.retriever = HybridRetriever(
+                self.vector_store,
+                self.embedding_model,
+                self.chunks
+            )
+        
+        print("Initializing query router...")
+        router_path = os.path.join(chroma_store.persist_directory, "router_centroids.json")
+        self.router = QueryRouter(persist_path=router_path)
+        if not self.router.load(router_path) or len(self.router) != chroma_store.get_count():
+            self.router.build_from_vector_store(chroma_store)
+            self.router.save(router_path)
         
         print("Initializing answer generator...")
         self.generator = AnswerGenerator(api_key=api_key)
         
+        self.watcher = None
+        
         print("-" * 60)
         print("RAG Chatbot ready!")
         print(f"Vector database: {self.vector_store.get_count()} chunks")
         print("-" * 60)
     
+    def start_watcher(self, directory: str = "./documents", **kwargs) -> DocumentWatcher:
+        """
+        Keep the indexes in sync with new, changed and removed files in directory
+
+        Files added, changed or removed while the app was not running are
+        picked up on start, by comparing the folder with the watcher state
+        saved next to the Chroma database and the sources in the index.
+        """
+        if self.watcher is None:
+            # The quantized index, the shards and the router are all rebuilt
+            # from Chroma on start, so Chroma has to receive every change too
+            retrievers = [self.retriever, self.router]
+            if getattr(self.retriever, 'vector_store', None) is not self.chroma_store:
+                retrievers.insert(0, self.chroma_store)
+
+            kwargs.setdefault('indexed_sources', self.router.sources)
+            kwargs.setdefault(
+                'state_path',
+                os.path.join(self.chroma_store.persist_directory, "watched_files.json")
+            )
+            self.watcher = DocumentWatcher(
+                directory,
+                self.embedding_model,
+                retrievers=retrievers,
+                **kwargs
+            )
+            self.watcher.start()
+        return self.watcher
+    
+    def index_version(self) -> int:
+        """Changes whenever the watcher publishes an update to the indexes"""
+        return self.watcher.version if self.watcher is not None else 0
+    
     def ask(
         self,
         question: str,
         n_results: int = 5,
         verbose: bool = False,
-        categories: List[str] = None
+        categories: List[str] = None,
+        memory: ConversationMemory = None
     ) -> Dict[str, Any]:
 
         if verbose:
             print(f"\nQuestion: {question}")
             print("-" * 60)
         
-        if not self.generator.check_relevance(question):
+        timings = {}
+        
+        # Follow-ups are rewritten into standalone queries from the session memory
+        query = memory.rewrite(question) if memory is not None else question
+        if verbose and query != question:
+            print(f"Standalone query: {query}")
+        
+        start = time.perf_counter()
+        query_embedding = self.embedding_model.embed_text(query)
+        timings['embedding_ms'] = (time.perf_counter() - start) * 1000
+        
+        # Local relevance gate and routing; falls back to the keyword check
+        # when there are no centroids yet
+        start = time.perf_counter()
+        route = self.router.route(query_embedding)
+        if route['best_score'] is None:
+            route['relevant'] = self.generator.check_relevance(query)
+        timings['routing_ms'] = (time.perf_counter() - start) * 1000
+        
+        if verbose:
+            print(f"Routing: {route['scores']} ({timings['routing_ms']:.2f} ms)")
+        
+        if not route['relevant']:
             return {
                 'answer': "I'm sorry, but your question doesn't seem to be related to healthcare, insurance, or pharmaceutical topics. I can only answer questions about these domains based on the documents I have access to.",
                 'sources': [],
                 'retrieved_chunks': 0,
-                'relevant': False
+                'relevant': False,
+                'timings': timings
             }
         
+        # Narrow the search to the likely categories the user has not filtered out
+        search_categories = categories
+        routed = [cat for cat in route['categories'] if not categories or cat in categories]
+        if routed:
+            search_categories = routed
+        
         if verbose:
             print(f"Retrieving top {n_results} relevant chunks...")
-            if categories:
-                print(f"Filtering by categories: {categories}")
+            if search_categories:
+                print(f"Filtering by categories: {search_categories}")
         
-        retrieved_chunks = self.retriever.retrieve(
-            query=question,
-            n_results=n_results,
-            categories=categories
-        )
+        start = time.perf_counter()
+        # Read before retrieving, so chunks are never stamped newer than they are
+        index_version = self.index_version()
+        retrieved_chunks = None
+        if memory is not None:
+            retrieved_chunks = memory.reusable_chunks(
+                query_embedding, n_results, search_categories, index_version
+            )
+        reused_context = retrieved_chunks is not None
+        if not reused_context:
+            retrieved_chunks = self.retriever.retrieve(
+                query=query,
+                n_results=n_results,
+                categories=search_categories,
+                query_embedding=query_embedding
+            )
+        timings['retrieval_ms'] = (time.perf_counter() - start) * 1000
+        
+        if verbose and reused_context:
+            print("Reusing chunks retrieved in earlier turns")
+        
+        # Keyword scores are normalised per query, so only the semantic score
+        # says how close the best chunk really is
+        best_score = max((chunk['semantic_score'] for chunk in retrieved_chunks), default=0)
+        
+        # The router may have picked the wrong categories, so search everything
+        # the user's own filters allow before giving up
+        if best_score < self.router.min_retrieval_score and search_categories != categories:
+            if verbose:
+                print("No close match in the routed categories, searching all allowed categories...")
+            start = time.perf_counter()
+            retrieved_chunks = self.retriever.retrieve(
+                query=query,
+                n_results=n_results,
+                categories=categories,
+                query_embedding=query_embedding
+            )
+            timings['fallback_retrieval_ms'] = (time.perf_counter() - start) * 1000
+            search_categories = categories
+            reused_context = False
+            best_score = max((chunk['semantic_score'] for chunk in retrieved_chunks), default=0)
         
         if verbose:
             print(f"Retrieved {len(retrieved_chunks)} chunks")
@@ -79,17 +226,39 @@ class RAGChatbot:
                 print(f"  Source: {chunk['metadata']['source']}")
                 print(f"  Preview: {chunk['content'][:100]}...")
         
+        if best_score < self.router.min_retrieval_score:
+            return {
+                'answer': "I couldn't find anything in the documents that answers this question.",
+                'sources': [],
+                'retrieved_chunks': len(retrieved_chunks),
+                'relevant': True,
+                'filtered_categories': search_categories if search_categories else ['all'],
+                'timings': timings
+            }
+        
         if verbose:
             print("\nGenerating answer with Claude API...")
         
+        start = time.perf_counter()
         result = self.generator.generate_answer(
             query=question,
-            context_chunks=retrieved_chunks
+            context_chunks=retrieved_chunks,
+            history=memory.history_text() if memory is not None else None
         )
+        timings['generation_ms'] = (time.perf_counter() - start) * 1000
+        
+        if memory is not None and 'error' not in result:
+            memory.add_turn(
+                question, query, result['answer'], query_embedding, retrieved_chunks,
+                index_version=index_version
+            )
         
         result['retrieved_chunks'] = len(retrieved_chunks)
         result['relevant'] = True
-        result['filtered_categories'] = categories if categories else ['all']
+        result['filtered_categories'] = search_categories if search_categories else ['all']
+        result['timings'] = timings
+        result['standalone_question'] = query
+        result['reused_context'] = reused_context
         
         if verbose:
             print("Answer generated")
@@ -2,9 +2,16 @@
 Text chunking module for RAG chatbot
 """
 from typing import List, Dict, Any
+import hashlib
 import tiktoken
 
 
+def make_chunk_id(metadata: Dict[str, Any]) -> str:
+    """Deterministic chunk ID from source, page and chunk position"""
+    key = f"{metadata.get('source')}:{metadata.get('page', 0)}:{metadata.get('chunk_id', 0)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
 class TextChunker:
     """Chunks text into smaller pieces with overlap"""
     def __init__(self, chunk_size: int = 512, chunk_overlap: int = 128):
@@ -49,6 +56,7 @@ class TextChunker:
                         'token_count': len(chunk_tokens)
                     }
                 }
+                chunk['id'] = make_chunk_id(chunk['metadata'])
                 chunks.append(chunk)
                 
                 start += self.chunk_size - self.chunk_overlap
@@ -73,6 +81,7 @@ class TextChunker:
                         'char_count': len(chunk_text)
                     }
                 }
+                chunk['id'] = make_chunk_id(chunk['metadata'])
                 chunks.append(chunk)
                 
                 start += char_chunk_size - char_overlap
@@ -0,0 +1,223 @@
+"""
+Conversation memory module for RAG chatbot
+"""
+
+import re
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from .chunker import TextChunker
+
+
+# Only words and openings that point back at the previous turn; a question
+# that is merely short is not treated as a follow-up
+FOLLOW_UP_WORDS = {
+    'it', 'its', 'they', 'them', 'their', 'he', 'she', 'his', 'her', 'same'
+}
+
+# Usually a determiner ("this drug") or relative pronoun ("trials that test"),
+# so they only refer back when they close the question ("Why is that?")
+DEMONSTRATIVES = {'this', 'that', 'these', 'those'}
+
+FOLLOW_UP_PREFIXES = (
+    'and ', 'but ', 'also ', 'what about ', 'how about ', 'what else ', 'so '
+)
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'of', 'in', 'on', 'for', 'to', 'from',
+    'with', 'by', 'at', 'as', 'is', 'are', 'was', 'were', 'be', 'been', 'do', 'does',
+    'did', 'what', 'which', 'who', 'whom', 'how', 'why', 'when', 'where', 'can',
+    'could', 'should', 'would', 'will', 'about', 'tell', 'me', 'explain', 'describe',
+    'please', 'there', 'any', 'some', 'more', 'else', 'also', 'i', 'you', 'we'
+}
+
+
+def _normalize(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class ConversationMemory:
+    """
+    Per-session memory used to make follow-up questions cheaper.
+
+    Keeps the last turns' questions, answers, query embeddings and retrieved
+    chunks (IDs, text and embeddings). Follow-ups are rewritten into
+    standalone queries by carrying over the previous topic terms, cached
+    chunks are reused when they still score well against the new question,
+    and turns older than max_turns are compacted into one-line summaries.
+    history_text() never exceeds history_token_budget, so the prompt does
+    not grow with the length of the chat.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 4,
+        history_token_budget: int = 600,
+        reuse_threshold: float = 0.8,
+        min_reuse_score: float = 0.7,
+        max_summary_lines: int = 20
+    ):
+        self.max_turns = max_turns
+        self.history_token_budget = history_token_budget
+        self.reuse_threshold = reuse_threshold
+        self.min_reuse_score = min_reuse_score
+        self.max_summary_lines = max_summary_lines
+
+        self.turns: List[Dict[str, Any]] = []
+        self.summary_lines: List[str] = []
+        self._count_tokens = TextChunker().count_tokens
+
+    def clear(self) -> None:
+        self.turns = []
+        self.summary_lines = []
+
+    @staticmethod
+    def _terms(text: str) -> List[str]:
+        return re.findall(r"[a-z0-9][a-z0-9\-]*", text.lower())
+
+    def is_follow_up(self, question: str) -> bool:
+        if not self.turns:
+            return False
+        terms = self._terms(question)
+        # Matched on the terms, so punctuation ("Also, ...") does not hide a prefix
+        opening = " ".join(terms) + " "
+        return (
+            opening.startswith(FOLLOW_UP_PREFIXES)
+            or any(term in FOLLOW_UP_WORDS for term in terms)
+            or (bool(terms) and terms[-1] in DEMONSTRATIVES)
+        )
+
+    def rewrite(self, question: str) -> str:
+        """Turn a follow-up into a standalone query without calling the LLM"""
+        if not self.is_follow_up(question):
+            return question
+
+        present = set(self._terms(question))
+        topic = []
+        for term in self._terms(self.turns[-1]['standalone']):
+            if (term in STOPWORDS or term in FOLLOW_UP_WORDS or term in DEMONSTRATIVES
+                    or term in present or term in topic):
+                continue
+            topic.append(term)
+
+        if not topic:
+            return question
+        return f"{question.strip()} {' '.join(topic[:8])}"
+
+    def reusable_chunks(
+        self,
+        query_embedding: List[float],
+        n_results: int,
+        categories: List[str] = None,
+        index_version: int = 0
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Chunks from earlier turns that still answer the new query
+
+        Returns None unless the query is close to the previous one and at least
+        n_results cached chunks score above min_reuse_score. Only chunks cached
+        at the current index_version are used, so text from files that have
+        since been changed or removed is never reused.
+        """
+        if not self.turns:
+            return None
+
+        query = _normalize(query_embedding)
+        if float(query @ self.turns[-1]['query_embedding']) < self.reuse_threshold:
+            return None
+
+        seen = set()
+        candidates = []
+        for turn in reversed(self.turns):
+            if turn['index_version'] != index_version:
+                continue
+            for chunk in turn['chunks']:
+                if chunk['id'] in seen or chunk['embedding'] is None:
+                    continue
+                if categories and chunk['metadata'].get('category') not in categories:
+                    continue
+                seen.add(chunk['id'])
+                semantic_score = (1 + float(query @ chunk['embedding'])) / 2
+                candidates.append({
+                    'id': chunk['id'],
+                    'content': chunk['content'],
+                    'metadata': chunk['metadata'],
+                    'score': semantic_score,
+                    'semantic_score': semantic_score,
+                    'keyword_score': 0.0,
+                    'embedding': chunk['embedding'],
+                    'reused': True
+                })
+
+        candidates.sort(key=lambda x: x['score'], reverse=True)
+        top = candidates[:n_results]
+        if len(top) < n_results or top[-1]['semantic_score'] < self.min_reuse_score:
+            return None
+        return top
+
+    def add_turn(
+        self,
+        question: str,
+        standalone: str,
+        answer: str,
+        query_embedding: List[float],
+        chunks: List[Dict[str, Any]],
+        index_version: int = 0
+    ) -> None:
+        self.turns.append({
+            'question': question,
+            'standalone': standalone,
+            'answer': answer,
+            'query_embedding': _normalize(query_embedding),
+            'index_version': index_version,
+            'chunks': [
+                {
+                    'id': chunk.get('id'),
+                    'content': chunk['content'],
+                    'metadata': chunk['metadata'],
+                    'embedding': _normalize(chunk['embedding']) if chunk.get('embedding') is not None else None
+                }
+                for chunk in chunks
+            ]
+        })
+
+        while len(self.turns) > self.max_turns:
+            self.summary_lines.append(self._summarize(self.turns.pop(0)))
+        del self.summary_lines[:-self.max_summary_lines]
+
+    @staticmethod
+    def _summarize(turn: Dict[str, Any], max_words: int = 40) -> str:
+        first_sentence = re.split(r"(?<=[.!?])\s", turn['answer'].strip(), maxsplit=1)[0]
+        words = first_sentence.split()
+        if len(words) > max_words:
+            first_sentence = " ".join(words[:max_words]) + "..."
+        return f"Q: {turn['question']} A: {first_sentence}"
+
+    def history_text(self) -> str:
+        """Recent turns in full and older turns as summaries, within the token budget"""
+        budget = self.history_token_budget
+        parts = []
+
+        # Newest first, so the most recent context survives when the budget runs out
+        for turn in reversed(self.turns):
+            full = f"User: {turn['question']}\nAssistant: {turn['answer']}"
+            cost = self._count_tokens(full)
+            if cost > budget:
+                full = self._summarize(turn)
+                cost = self._count_tokens(full)
+            if cost > budget:
+                break
+            parts.append(full)
+            budget -= cost
+
+        for line in reversed(self.summary_lines):
+            cost = self._count_tokens(line)
+            if cost > budget:
+                break
+            parts.append(line)
+            budget -= cost
+
+        return "\n\n".join(reversed(parts))
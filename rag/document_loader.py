@@ -84,6 +84,17 @@ class DocumentLoader:
             print(f"Error loading TXT {file_path}: {e}")
         return documents
     
+    SUPPORTED_EXTENSIONS = ('.pdf', '.txt')
+    
+    @staticmethod
+    def load_file(file_path: str) -> List[Document]:
+        ext = Path(file_path).suffix.lower()
+        if ext == '.pdf':
+            return DocumentLoader.load_pdf(file_path)
+        if ext == '.txt':
+            return DocumentLoader.load_txt(file_path)
+        return []
+    
     @staticmethod
     def load_directory(directory_path: str) -> List[Document]:
         documents = []
@@ -92,18 +103,12 @@ class DocumentLoader:
         if not path.exists():
             print(f"Directory {directory_path} does not exist")
             return documents
-        
-        loaders = {
-            '.pdf': DocumentLoader.load_pdf,
-            '.txt': DocumentLoader.load_txt,
-        }
 
         for file_path in path.rglob('*'):
             if file_path.is_file():
-                ext = file_path.suffix.lower()
-                if ext in loaders:
+                if file_path.suffix.lower() in DocumentLoader.SUPPORTED_EXTENSIONS:
                     print(f"Loading {file_path.name}...")
-                    docs = loaders[ext](str(file_path))
+                    docs = DocumentLoader.load_file(str(file_path))
                     documents.extend(docs)
         
         print(f"\n✓ Loaded {len(documents)} document pages from {directory_path}")
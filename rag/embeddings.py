@@ -6,17 +6,46 @@ from typing import List
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from .batching import MicroBatcher
+
 
 class EmbeddingModel:
     """Creates embeddings using sentence-transformers"""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        micro_batching: bool = True,
+        max_batch_size: int = 32,
+        batch_window_ms: float = 5.0
+    ):
         print(f"Loading embedding model: {model_name}...")
         self.model = SentenceTransformer(model_name)
         self.dimension = self.model.get_sentence_embedding_dimension()
         print(f"✓ Model loaded (dimension: {self.dimension})")
+
+        # Concurrent embed_text calls are queued for a few milliseconds and
+        # encoded together instead of as many batch-of-1 forward passes
+        self.batcher = None
+        if micro_batching:
+            self.batcher = MicroBatcher(
+                self._encode_queries,
+                max_batch_size=max_batch_size,
+                batch_window_ms=batch_window_ms
+            )
+    
+    def _encode_queries(self, texts: List[str]) -> List[List[float]]:
+        embeddings = self.model.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return embeddings.tolist()
     
     def embed_text(self, text: str) -> List[float]:
+        if self.batcher is not None:
+            return self.batcher.submit(text)
         embedding = self.model.encode(text, convert_to_numpy=True)
         return embedding.tolist()
     
@@ -29,4 +58,9 @@ class EmbeddingModel:
             show_progress_bar=True
         )
         print("Embeddings created")
-        return embeddings.tolist()
\ No newline at end of file
+        return embeddings.tolist()
+    
+    def close(self) -> None:
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
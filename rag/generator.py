@@ -25,7 +25,8 @@ class AnswerGenerator:
         self,
         query: str,
         context_chunks: List[Dict[str, Any]],
-        max_tokens: int = 1024
+        max_tokens: int = 1024,
+        history: str = None
     ) -> Dict[str, Any]:
         context_parts = []
         sources = []
@@ -41,10 +42,17 @@ class AnswerGenerator:
         
         context_text = "\n\n".join(context_parts)
         
+        history_section = ""
+        if history:
+            history_section = f"""CONVERSATION SO FAR:
+{history}
+
+"""
+        
         # Create prompt
         prompt = f"""You are a helpful assistant that answers questions based on provided documents.
 
-CONTEXT FROM DOCUMENTS:
+{history_section}CONTEXT FROM DOCUMENTS:
 {context_text}
 
 USER QUESTION:
@@ -0,0 +1,154 @@
+"""
+Incremental keyword index module for RAG chatbot
+"""
+
+import math
+import threading
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
+
+
+class KeywordIndex:
+    """
+    BM25 keyword index that supports adding, updating and deleting documents
+    in place. Postings and document frequencies are maintained incrementally
+    and a write only touches the entries of the documents it changes.
+
+    Searches are never blocked by writes. A postings list is never modified
+    once published: a write builds a new copy of each list it touches and
+    swaps it in, so a search running at the same time sees every term either
+    before or after the update.
+
+    IDF uses the non-negative BM25 variant log(1 + (N - df + 0.5) / (df + 0.5)),
+    which needs no corpus-wide recalculation when documents change.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._write_lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        # (document count, total length), replaced as one value
+        self._totals: Tuple[int, int] = (0, 0)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return text.lower().split()
+
+    def __len__(self) -> int:
+        return self._totals[0]
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_terms
+
+    def upsert(self, documents: List[Tuple[str, str]]) -> None:
+        """Add or replace documents given as (doc_id, text) pairs"""
+        self._apply(documents, [])
+
+    def delete(self, doc_ids: List[str]) -> None:
+        self._apply([], doc_ids)
+
+    def _apply(self, upserts: List[Tuple[str, str]], deletes: List[str]) -> None:
+        with self._write_lock:
+            postings = self._postings
+            doc_terms = self._doc_terms
+            doc_lengths = self._doc_lengths
+            num_docs, total_length = self._totals
+            changed: Dict[str, Dict[str, int]] = {}
+
+            def postings_for(term: str) -> Dict[str, int]:
+                if term not in changed:
+                    changed[term] = dict(postings.get(term, {}))
+                return changed[term]
+
+            def remove(doc_id: str) -> int:
+                terms = doc_terms.pop(doc_id, None)
+                if terms is None:
+                    return 0
+                for term in terms:
+                    postings_for(term).pop(doc_id, None)
+                # A document repeated within one batch is only in new_lengths
+                if doc_id in new_lengths:
+                    return new_lengths.pop(doc_id)
+                return doc_lengths[doc_id]
+
+            removed = set()
+            new_lengths = {}
+            for doc_id in deletes:
+                if doc_id in doc_terms:
+                    total_length -= remove(doc_id)
+                    num_docs -= 1
+                    removed.add(doc_id)
+
+            for doc_id, text in upserts:
+                if doc_id in doc_terms:
+                    total_length -= remove(doc_id)
+                else:
+                    num_docs += 1
+                removed.discard(doc_id)
+                terms = Counter(self.tokenize(text))
+                doc_terms[doc_id] = terms
+                new_lengths[doc_id] = sum(terms.values())
+                total_length += new_lengths[doc_id]
+                for term, tf in terms.items():
+                    postings_for(term)[doc_id] = tf
+
+            # Lengths go in before the postings that reference them and come
+            # out after, so a concurrent search always finds them
+            doc_lengths.update(new_lengths)
+            for term, term_postings in changed.items():
+                if term_postings:
+                    postings[term] = term_postings
+                else:
+                    postings.pop(term, None)
+            for doc_id in removed:
+                del doc_lengths[doc_id]
+            self._totals = (num_docs, total_length)
+
+    def term_stats(self, tokenized_query: List[str]) -> Tuple[int, int, Dict[str, int]]:
+        """Document count, total length and query term document frequencies"""
+        postings = self._postings
+        num_docs, total_length = self._totals
+        dfs = {term: len(postings.get(term, ())) for term in set(tokenized_query)}
+        return num_docs, total_length, dfs
+
+    def get_scores(
+        self,
+        tokenized_query: List[str],
+        stats: Optional[Tuple[int, int, Dict[str, int]]] = None
+    ) -> Dict[str, float]:
+        """
+        BM25 scores for every document containing at least one query term
+
+        stats, in the form returned by term_stats(), replaces this index's own
+        statistics; indexes that each hold part of a corpus pass the summed
+        statistics of all parts so their scores are comparable.
+        """
+        postings = self._postings
+        doc_lengths = self._doc_lengths
+        if stats is None:
+            stats = self.term_stats(tokenized_query)
+        num_docs, total_length, dfs = stats
+        if num_docs == 0 or not self._totals[0]:
+            return {}
+
+        avg_length = total_length / num_docs
+        scores: Dict[str, float] = {}
+
+        # Repeated query terms count once per occurrence, as in BM25Okapi
+        for term, query_count in Counter(tokenized_query).items():
+            term_postings = postings.get(term)
+            if not term_postings:
+                continue
+            df = dfs[term]
+            idf = query_count * math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in term_postings.items():
+                doc_length = doc_lengths.get(doc_id)
+                if doc_length is None:
+                    continue
+                denominator = tf + self.k1 * (1 - self.b + self.b * doc_length / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / denominator
+
+        return scores
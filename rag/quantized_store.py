@@ -0,0 +1,666 @@
+"""
+Quantized vector store module for RAG chatbot
+"""
+
+import json
+import os
+import sys
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from .chunker import make_chunk_id
+
+
+# Number of set bits for every byte value, used for Hamming distance
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+def _matches(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate the subset of Chroma's where syntax used by the retriever"""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$or":
+            if not any(_matches(metadata, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(_matches(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            if "$eq" in condition and value != condition["$eq"]:
+                return False
+            if "$ne" in condition and value == condition["$ne"]:
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def _filter_categories(where: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+    """Categories named by a category-only filter, or None for any other filter"""
+    if set(where) == {"category"}:
+        condition = where["category"]
+        if isinstance(condition, dict):
+            if set(condition) == {"$eq"}:
+                return [condition["$eq"]]
+            if set(condition) == {"$in"}:
+                return list(condition["$in"])
+            return None
+        return [condition]
+    if set(where) == {"$or"}:
+        categories = []
+        for sub in where["$or"]:
+            sub_categories = _filter_categories(sub)
+            if sub_categories is None:
+                return None
+            categories.extend(sub_categories)
+        return categories
+    return None
+
+
+def _grow(buffer: Optional[np.ndarray], used: int, new: np.ndarray) -> np.ndarray:
+    """Append new rows after the first used rows, doubling capacity when full"""
+    needed = used + len(new)
+    if buffer is None or len(buffer) < needed:
+        capacity = max(needed, 2 * (len(buffer) if buffer is not None else 0), 1024)
+        grown = np.zeros((capacity,) + new.shape[1:], dtype=new.dtype)
+        if buffer is not None:
+            grown[:used] = buffer[:used]
+        buffer = grown
+    buffer[used:needed] = new
+    return buffer
+
+
+class _View:
+    """
+    Everything a search reads, published as one object; a search takes the
+    current view once and never sees a half-applied write
+    """
+
+    __slots__ = ('count', 'live', 'ids', 'metadatas', 'offsets', 'lengths', 'codes', 'scales',
+                 'deleted', 'vectors', 'category_rows', 'chunks_file')
+
+    def __init__(
+        self,
+        count: int = 0,
+        live: int = 0,
+        ids: List[str] = None,
+        metadatas: List[Dict[str, Any]] = None,
+        offsets: List[int] = None,
+        lengths: List[int] = None,
+        codes: np.ndarray = None,
+        scales: np.ndarray = None,
+        deleted: np.ndarray = None,
+        vectors: np.ndarray = None,
+        category_rows: Dict[Any, np.ndarray] = None,
+        chunks_file=None
+    ):
+        # ids, metadatas, offsets and lengths are append-only lists shared
+        # between views; a view only ever reads its first count entries
+        self.count = count
+        self.live = live
+        self.ids = ids if ids is not None else []
+        self.metadatas = metadatas if metadatas is not None else []
+        self.offsets = offsets if offsets is not None else []
+        self.lengths = lengths if lengths is not None else []
+        self.codes = codes
+        self.scales = scales
+        self.deleted = deleted if deleted is not None else np.zeros(0, dtype=bool)
+        self.vectors = vectors
+        self.category_rows = category_rows or {}
+        # Kept open, so a compaction that replaces chunks.jsonl doesn't move
+        # the text out from under searches still using this view
+        self.chunks_file = chunks_file
+
+
+class QuantizedVectorStore:
+    """
+    Vector store that keeps quantized embeddings in memory for a first-pass
+    search and re-scores a shortlist with float32 vectors from a memory-mapped file.
+
+    Modes:
+        int8:   one signed byte per dimension plus one scale per vector
+        binary: one bit per dimension (sign), compared with Hamming distance
+
+    Rows are append-only: updating or deleting a chunk marks its old row as
+    deleted and the row is skipped by searches. Every file is written by
+    appending or by patching single bytes, so adding a batch costs the size
+    of the batch, not the size of the store.
+
+    Writes are serialised and publish a new read view when they finish, so
+    searches running at the same time are never blocked or broken by them.
+    Once deleted rows outnumber live ones, the files are rewritten with the
+    live rows only (compact), so repeated updates don't grow them forever.
+    """
+
+    MODES = ("int8", "binary")
+    FILES = ("index.json", "vectors.f32", "codes.bin", "scales.f32", "chunks.jsonl", "deleted.bin")
+    _BLOCK = 65536
+    _MIN_COMPACT_ROWS = 1000
+
+    def __init__(
+        self,
+        persist_directory: str = "./quantized_db",
+        mode: str = "int8",
+        rescore_multiplier: int = None
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}")
+
+        self.persist_directory = persist_directory
+        self.mode = mode
+        # Binary codes are much coarser, so they need a longer shortlist
+        if rescore_multiplier is None:
+            rescore_multiplier = 10 if mode == "int8" else 40
+        self.rescore_multiplier = rescore_multiplier
+        self._write_lock = threading.RLock()
+
+        os.makedirs(persist_directory, exist_ok=True)
+        (self._info_path, self._vectors_path, self._codes_path,
+         self._scales_path, self._chunks_path, self._deleted_path) = (
+            os.path.join(persist_directory, name) for name in self.FILES
+        )
+
+        print(f"Initializing quantized store at {persist_directory} ({mode})...")
+        self._load()
+        print(f"Quantized store ready ({self.get_count()} documents)")
+
+    def _load(self) -> None:
+        self.dimension = None
+        # Writer-side state; searches only read self._view
+        self._rows: Dict[str, int] = {}
+        self._codes_buffer = self._scales_buffer = None
+
+        if not os.path.exists(self._info_path):
+            self._view = _View()
+            return
+
+        with open(self._info_path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        if info["mode"] != self.mode:
+            raise ValueError(
+                f"Store at {self.persist_directory} was built in '{info['mode']}' mode"
+            )
+        self.dimension = info["dimension"]
+
+        # Only ids, metadata and file offsets stay in memory; chunk text is
+        # read from disk for the final results
+        ids, metadatas, offsets, lengths = [], [], [], []
+        category_rows: Dict[Any, List[int]] = {}
+        offset = 0
+        with open(self._chunks_path, "rb") as f:
+            for line in f:
+                record = json.loads(line)
+                category_rows.setdefault(record["metadata"].get("category"), []).append(len(ids))
+                self._rows[record["id"]] = len(ids)
+                ids.append(record["id"])
+                metadatas.append(record["metadata"])
+                offsets.append(offset)
+                lengths.append(len(line))
+                offset += len(line)
+
+        count = len(ids)
+        codes = np.fromfile(self._codes_path, dtype=self._code_dtype()).reshape(count, -1)
+        scales = np.fromfile(self._scales_path, dtype=np.float32) if self.mode == "int8" else None
+        deleted = np.fromfile(self._deleted_path, dtype=bool)
+        self._codes_buffer, self._scales_buffer = codes, scales
+        self._rows = {chunk_id: row for chunk_id, row in self._rows.items() if not deleted[row]}
+
+        self._view = _View(
+            count=count,
+            live=len(self._rows),
+            ids=ids,
+            metadatas=metadatas,
+            offsets=offsets,
+            lengths=lengths,
+            codes=codes,
+            scales=scales,
+            deleted=deleted,
+            vectors=self._open_vectors(count),
+            category_rows={
+                category: np.asarray(rows, dtype=np.int64) for category, rows in category_rows.items()
+            },
+            chunks_file=open(self._chunks_path, "rb")
+        )
+        self._maybe_compact()
+
+    def _code_dtype(self):
+        return np.int8 if self.mode == "int8" else np.uint8
+
+    def _open_vectors(self, count: int) -> Optional[np.ndarray]:
+        if count == 0:
+            return None
+        return np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r", shape=(count, self.dimension)
+        )
+
+    def _quantize(self, vectors: np.ndarray):
+        if self.mode == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.round(vectors / scales[:, None]).astype(np.int8)
+            return codes, scales.astype(np.float32)
+        return np.packbits(vectors > 0, axis=1), None
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    # Kept as read-only shortcuts to the current view
+    @property
+    def ids(self) -> List[str]:
+        return self._view.ids[:self._view.count]
+
+    @property
+    def metadatas(self) -> List[Dict[str, Any]]:
+        return self._view.metadatas[:self._view.count]
+
+    @property
+    def deleted(self) -> np.ndarray:
+        return self._view.deleted
+
+    def add_documents(
+        self,
+        chunks: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> None:
+        if len(chunks) != len(embeddings):
+            raise ValueError("Number of chunks and embeddings must match")
+        if not chunks:
+            return
+
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        ids = [chunk.get('id') or make_chunk_id(chunk['metadata']) for chunk in chunks]
+        codes, scales = self._quantize(vectors)
+
+        print(f"Adding {len(chunks)} documents to quantized store...")
+
+        with self._write_lock:
+            if self.dimension is None:
+                self.dimension = vectors.shape[1]
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(f"Expected embeddings of dimension {self.dimension}")
+
+            old = self._view
+            start = old.count
+            count = start + len(ids)
+
+            # Files are only appended to, so the memmap and offsets held by
+            # running searches stay valid
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._codes_path, "ab") as f:
+                f.write(codes.tobytes())
+            if self.mode == "int8":
+                with open(self._scales_path, "ab") as f:
+                    f.write(scales.tobytes())
+            with open(self._deleted_path, "ab") as f:
+                f.write(bytes(len(ids)))
+
+            offset = os.path.getsize(self._chunks_path) if os.path.exists(self._chunks_path) else 0
+            with open(self._chunks_path, "ab") as f:
+                for chunk_id, chunk in zip(ids, chunks):
+                    line = (json.dumps({
+                        'id': chunk_id,
+                        'content': chunk['content'],
+                        'metadata': chunk['metadata']
+                    }) + "\n").encode("utf-8")
+                    f.write(line)
+                    old.offsets.append(offset)
+                    old.lengths.append(len(line))
+                    offset += len(line)
+
+            # Codes and scales live in buffers that grow by doubling; rows past
+            # an old view's count are never read through that view
+            self._codes_buffer = _grow(self._codes_buffer, start, codes)
+            if self.mode == "int8":
+                self._scales_buffer = _grow(self._scales_buffer, start, scales)
+
+            # Deleted flags are one byte per row and copied on write, so a
+            # running search never sees a row vanish before its replacement
+            deleted = np.zeros(count, dtype=bool)
+            deleted[:start] = old.deleted
+
+            # Re-added IDs replace their earlier rows, including repeats within this batch
+            replaced = []
+            new_category_rows: Dict[Any, List[int]] = {}
+            for row, (chunk_id, chunk) in enumerate(zip(ids, chunks), start):
+                if chunk_id in self._rows:
+                    replaced.append(self._rows[chunk_id])
+                self._rows[chunk_id] = row
+                old.ids.append(chunk_id)
+                old.metadatas.append(chunk['metadata'])
+                new_category_rows.setdefault(chunk['metadata'].get('category'), []).append(row)
+            deleted[replaced] = True
+            self._persist_deleted(replaced)
+
+            category_rows = dict(old.category_rows)
+            for category, rows in new_category_rows.items():
+                category_rows[category] = np.concatenate([
+                    category_rows.get(category, np.array([], dtype=np.int64)),
+                    np.asarray(rows, dtype=np.int64)
+                ])
+
+            with open(self._info_path, "w", encoding="utf-8") as f:
+                json.dump({'mode': self.mode, 'dimension': self.dimension, 'count': count}, f)
+
+            self._view = _View(
+                count=count,
+                live=len(self._rows),
+                ids=old.ids,
+                metadatas=old.metadatas,
+                offsets=old.offsets,
+                lengths=old.lengths,
+                codes=self._codes_buffer[:count],
+                scales=self._scales_buffer[:count] if self.mode == "int8" else None,
+                deleted=deleted,
+                vectors=self._open_vectors(count),
+                category_rows=category_rows,
+                chunks_file=old.chunks_file or open(self._chunks_path, "rb")
+            )
+            self._maybe_compact()
+        print(f"Successfully added {len(chunks)} documents")
+
+    def _persist_deleted(self, rows: List[int]) -> None:
+        """Patch the bytes of newly deleted rows in deleted.bin"""
+        if not rows:
+            return
+        with open(self._deleted_path, "r+b") as f:
+            for row in sorted(rows):
+                f.seek(row)
+                f.write(b"\x01")
+
+    def delete_documents(self, ids: List[str]) -> None:
+        with self._write_lock:
+            rows = [self._rows.pop(chunk_id) for chunk_id in ids if chunk_id in self._rows]
+            if not rows:
+                return
+            old = self._view
+            deleted = old.deleted.copy()
+            deleted[rows] = True
+            self._persist_deleted(rows)
+
+            view = _View()
+            for name in _View.__slots__:
+                setattr(view, name, getattr(old, name))
+            view.deleted = deleted
+            view.live = len(self._rows)
+            self._view = view
+            self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        view = self._view
+        dead = view.count - view.live
+        if dead >= self._MIN_COMPACT_ROWS and dead > view.live:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the files with only the live rows and reload them"""
+        with self._write_lock:
+            view = self._view
+            rows = np.flatnonzero(~view.deleted)
+            print(f"Compacting quantized store ({view.count - view.live} deleted rows)...")
+
+            temp = {path: path + ".tmp" for path in (
+                self._info_path, self._vectors_path, self._codes_path,
+                self._scales_path, self._chunks_path, self._deleted_path
+            )}
+            with open(temp[self._vectors_path], "wb") as f:
+                for start in range(0, len(rows), self._BLOCK):
+                    f.write(np.asarray(view.vectors[rows[start:start + self._BLOCK]]).tobytes())
+            with open(temp[self._codes_path], "wb") as f:
+                f.write(view.codes[rows].tobytes())
+            with open(temp[self._scales_path], "wb") as f:
+                if self.mode == "int8":
+                    f.write(view.scales[rows].tobytes())
+            with open(temp[self._deleted_path], "wb") as f:
+                f.write(bytes(len(rows)))
+            with open(temp[self._chunks_path], "wb") as f:
+                for row in rows:
+                    f.write(self._read_line(view, row))
+            with open(temp[self._info_path], "w", encoding="utf-8") as f:
+                json.dump({'mode': self.mode, 'dimension': self.dimension, 'count': len(rows)}, f)
+
+            # index.json last, so it never describes files that are not in place yet
+            for path in list(temp)[1:] + [self._info_path]:
+                os.replace(temp[path], path)
+            self._load()
+
+    def get_source_ids(self, source: str) -> List[str]:
+        with self._write_lock:
+            view = self._view
+            return [
+                chunk_id for chunk_id, row in self._rows.items()
+                if view.metadatas[row].get('source') == source
+            ]
+
+    def delete_source(self, source: str) -> List[str]:
+        """Delete every chunk of one source file and return their IDs"""
+        with self._write_lock:
+            ids = self.get_source_ids(source)
+            self.delete_documents(ids)
+        return ids
+
+    def _approximate_scores(self, view: _View, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """First-pass similarity for the given rows, higher is better"""
+        scores = np.empty(len(rows), dtype=np.float32)
+        if self.mode == "int8":
+            for start in range(0, len(rows), self._BLOCK):
+                block = rows[start:start + self._BLOCK]
+                scores[start:start + len(block)] = (
+                    view.codes[block].astype(np.float32) @ query
+                ) * view.scales[block]
+        else:
+            query_bits = np.packbits(query > 0)
+            for start in range(0, len(rows), self._BLOCK):
+                block = rows[start:start + self._BLOCK]
+                hamming = _POPCOUNT[np.bitwise_xor(view.codes[block], query_bits)].sum(axis=1, dtype=np.int32)
+                scores[start:start + len(block)] = -hamming
+        return scores
+
+    @staticmethod
+    def _read_line(view: _View, row: int) -> bytes:
+        # pread never moves a shared file position, so threads can share the file
+        return os.pread(view.chunks_file.fileno(), view.lengths[row], view.offsets[row])
+
+    def _read_content(self, view: _View, row: int) -> str:
+        return json.loads(self._read_line(view, row))["content"]
+
+    def _candidate_rows(self, view: _View, filter_metadata: Optional[Dict[str, Any]]) -> np.ndarray:
+        if not filter_metadata:
+            return np.flatnonzero(~view.deleted)
+
+        # Category filters, the ones the router sends, use the per-category rows
+        categories = _filter_categories(filter_metadata)
+        if categories is not None:
+            rows = np.concatenate(
+                [view.category_rows.get(category, np.array([], dtype=np.int64))
+                 for category in set(categories)] or
+                [np.array([], dtype=np.int64)]
+            )
+            return np.sort(rows[~view.deleted[rows]])
+
+        return np.array(
+            [
+                i for i in range(view.count)
+                if not view.deleted[i] and _matches(view.metadatas[i], filter_metadata)
+            ],
+            dtype=np.int64
+        )
+
+    def _search_rows(
+        self,
+        view: _View,
+        query: np.ndarray,
+        n_results: int,
+        rows: np.ndarray,
+        rescore: bool = True
+    ):
+        if len(rows) == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        approx = self._approximate_scores(view, query, rows)
+        shortlist_size = min(len(rows), n_results * self.rescore_multiplier if rescore else n_results)
+        shortlist = np.argpartition(-approx, shortlist_size - 1)[:shortlist_size]
+        shortlist_rows = rows[shortlist]
+
+        if rescore:
+            # np.memmap fancy indexing only pages in the shortlisted rows
+            order = np.sort(shortlist_rows)
+            similarities = np.asarray(view.vectors[order]) @ query
+        else:
+            order = shortlist_rows
+            similarities = approx[shortlist]
+
+        top = np.argsort(-similarities)[:n_results]
+        return order[top], similarities[top]
+
+    def search(
+        self,
+        query_embedding: List[float],
+        n_results: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+
+        view = self._view
+        if not view.live:
+            return {'ids': [], 'documents': [], 'metadatas': [], 'distances': [], 'embeddings': []}
+
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32))
+        rows, similarities = self._search_rows(
+            view, query, n_results, self._candidate_rows(view, filter_metadata)
+        )
+
+        # Cosine distance, matching the Chroma collection's "hnsw:space": "cosine"
+        return {
+            'ids': [view.ids[row] for row in rows],
+            'documents': [self._read_content(view, row) for row in rows],
+            'metadatas': [view.metadatas[row] for row in rows],
+            'distances': [float(1 - sim) for sim in similarities],
+            'embeddings': [np.asarray(view.vectors[row]).tolist() for row in rows],
+        }
+
+    def get_count(self) -> int:
+        return self._view.live
+
+    @classmethod
+    def _remove_files(cls, persist_directory: str) -> None:
+        for name in cls.FILES:
+            path = os.path.join(persist_directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def clear(self) -> None:
+        with self._write_lock:
+            self._remove_files(self.persist_directory)
+            self._load()
+        print("Quantized store cleared")
+
+    def _bookkeeping_bytes(self, view: _View) -> int:
+        """Approximate RAM used by ids, metadata and the row lookup tables"""
+        total = sys.getsizeof(view.ids) + sys.getsizeof(view.metadatas)
+        total += sys.getsizeof(view.offsets) + sys.getsizeof(view.lengths) + sys.getsizeof(self._rows)
+        total += sum(sys.getsizeof(chunk_id) for chunk_id in view.ids[:view.count])
+        for metadata in view.metadatas[:view.count]:
+            total += sys.getsizeof(metadata)
+            total += sum(sys.getsizeof(value) for value in metadata.values())
+        total += sum(rows.nbytes for rows in view.category_rows.values())
+        # Numbers held by the offsets and lengths lists and the id -> row map
+        total += 3 * view.count * sys.getsizeof(view.count)
+        return total
+
+    def memory_footprint(self) -> Dict[str, int]:
+        """Bytes held in RAM by the quantized index versus a float32 in-memory index"""
+        view = self._view
+        count = view.count
+        codes_bytes = view.codes.nbytes if view.codes is not None else 0
+        scales_bytes = view.scales.nbytes if view.scales is not None else 0
+        quantized_bytes = codes_bytes + scales_bytes + view.deleted.nbytes
+        bookkeeping_bytes = self._bookkeeping_bytes(view)
+        float32_bytes = count * (self.dimension or 0) * 4
+        chunks_bytes = os.path.getsize(self._chunks_path) if count else 0
+
+        return {
+            'documents': view.live,
+            'deleted_rows': int(view.deleted.sum()),
+            'quantized_index_bytes': quantized_bytes,
+            'ids_and_metadata_bytes': bookkeeping_bytes,
+            'total_ram_bytes': quantized_bytes + bookkeeping_bytes,
+            'float32_index_bytes': float32_bytes,
+            'float32_on_disk_bytes': os.path.getsize(self._vectors_path) if count else 0,
+            'chunk_text_on_disk_bytes': chunks_bytes,
+            'compression_ratio': round(float32_bytes / max(codes_bytes + scales_bytes, 1), 2),
+        }
+
+    def evaluate_recall(self, query_embeddings: List[List[float]], k: int = 5) -> Dict[str, float]:
+        """
+        Recall@k of the quantized search against exact float32 search
+
+        Returns recall for the quantized first pass alone and after re-scoring.
+        """
+        view = self._view
+        if not view.live:
+            return {'k': k, 'queries': 0, 'first_pass_recall': 0.0, 'rescored_recall': 0.0}
+
+        rows = np.flatnonzero(~view.deleted)
+        first_pass_hits = 0
+        rescored_hits = 0
+        queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+
+        for query in queries:
+            exact = np.empty(view.count, dtype=np.float32)
+            for start in range(0, view.count, self._BLOCK):
+                exact[start:start + self._BLOCK] = np.asarray(
+                    view.vectors[start:start + self._BLOCK]
+                ) @ query
+            exact[view.deleted] = -np.inf
+            truth = set(np.argsort(-exact)[:k].tolist())
+
+            first_pass, _ = self._search_rows(view, query, k, rows, rescore=False)
+            rescored, _ = self._search_rows(view, query, k, rows, rescore=True)
+            first_pass_hits += len(truth & set(first_pass.tolist()))
+            rescored_hits += len(truth & set(rescored.tolist()))
+
+        total = len(queries) * min(k, len(rows))
+        return {
+            'k': k,
+            'queries': len(queries),
+            'first_pass_recall': first_pass_hits / total,
+            'rescored_recall': rescored_hits / total,
+        }
+
+    @classmethod
+    def from_vector_store(
+        cls,
+        vector_store,
+        persist_directory: str = "./quantized_db",
+        mode: str = "int8",
+        batch_size: int = 1000
+    ) -> "QuantizedVectorStore":
+        """Build a quantized store from an existing Chroma-backed VectorStore"""
+        # Removed before loading, since the old files may be in the other mode
+        cls._remove_files(persist_directory)
+        store = cls(persist_directory=persist_directory, mode=mode)
+
+        total = vector_store.get_count()
+        print(f"Copying {total} documents from Chroma...")
+        for offset in range(0, total, batch_size):
+            batch = vector_store.collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            chunks = [
+                {'id': chunk_id, 'content': doc, 'metadata': metadata}
+                for chunk_id, doc, metadata in zip(batch['ids'], batch['documents'], batch['metadatas'])
+            ]
+            store.add_documents(chunks, batch['embeddings'])
+
+        return store
@@ -1,79 +1,174 @@
+import threading
 from typing import List, Dict, Any
-from rank_bm25 import BM25Okapi
 import numpy as np
 
+from .chunker import make_chunk_id
+from .keyword_index import KeywordIndex
+
 
 class HybridRetriever:
-    
+
     def __init__(self, vector_store, embedding_model, chunks: List[Dict[str, Any]]):
         self.vector_store = vector_store
         self.embedding_model = embedding_model
-        self.chunks = chunks
+
+        # Writers are serialised and update the lookup tables in place;
+        # readers only do single lookups, which never see a partial entry
+        self._write_lock = threading.Lock()
+        self._ids_by_content: Dict[tuple, str] = {}
+        self._content_keys: Dict[str, tuple] = {}
+        self._ids_by_source: Dict[str, set] = {}
 
         print("Initializing BM25 keyword search...")
-        tokenized_docs = [chunk['content'].lower().split() for chunk in chunks]
-        self.bm25 = BM25Okapi(tokenized_docs)
+        self.keyword_index = KeywordIndex()
+        self._index_chunks(chunks)
         print("✓ BM25 initialized")
-    
+
+    def _index_chunks(self, chunks: List[Dict[str, Any]]) -> None:
+        for chunk in chunks:
+            if not chunk.get('id'):
+                chunk['id'] = make_chunk_id(chunk['metadata'])
+
+        ids_by_content = self._ids_by_content
+        content_keys = self._content_keys
+
+        for chunk in chunks:
+            chunk_id = chunk['id']
+            old_key = content_keys.get(chunk_id)
+            if old_key is not None:
+                self._ids_by_source.get(old_key[0], set()).discard(chunk_id)
+                if ids_by_content.get(old_key) == chunk_id:
+                    del ids_by_content[old_key]
+            key = (chunk['metadata'].get('source'), chunk['content'])
+            ids_by_content[key] = chunk_id
+            content_keys[chunk_id] = key
+            self._ids_by_source.setdefault(key[0], set()).add(chunk_id)
+
+        self.keyword_index.upsert([(chunk['id'], chunk['content']) for chunk in chunks])
+
+    def _unindex_chunks(self, ids: List[str]) -> None:
+        ids_by_content = self._ids_by_content
+        content_keys = self._content_keys
+
+        for chunk_id in ids:
+            key = content_keys.pop(chunk_id, None)
+            if key is None:
+                continue
+            self._ids_by_source.get(key[0], set()).discard(chunk_id)
+            if ids_by_content.get(key) == chunk_id:
+                del ids_by_content[key]
+
+        self.keyword_index.delete(ids)
+
+    def _source_ids(self, source: str) -> List[str]:
+        ids = set(self.vector_store.get_source_ids(source))
+        ids.update(self._ids_by_source.get(source, ()))
+        return list(ids)
+
+    def add_chunks(self, chunks: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+        """Add chunks to both indexes; chunks whose IDs already exist are updated"""
+        with self._write_lock:
+            self.vector_store.add_documents(chunks, embeddings)
+            self._index_chunks(chunks)
+
+    def delete_chunks(self, ids: List[str]) -> None:
+        with self._write_lock:
+            self.vector_store.delete_documents(ids)
+            self._unindex_chunks(ids)
+
+    def replace_source(
+        self,
+        source: str,
+        chunks: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> None:
+        """Swap in the new chunks of a changed file and drop the ones it no longer has"""
+        with self._write_lock:
+            new_ids = {chunk.get('id') or make_chunk_id(chunk['metadata']) for chunk in chunks}
+            stale_ids = [i for i in self._source_ids(source) if i not in new_ids]
+
+            # New chunks go in before stale ones are removed, so the file never
+            # disappears from results mid-update
+            if chunks:
+                self.vector_store.add_documents(chunks, embeddings)
+                self._index_chunks(chunks)
+            if stale_ids:
+                self.vector_store.delete_documents(stale_ids)
+                self._unindex_chunks(stale_ids)
+
+    def remove_source(self, source: str) -> None:
+        with self._write_lock:
+            ids = self._source_ids(source)
+            self.vector_store.delete_documents(ids)
+            self._unindex_chunks(ids)
+
     def retrieve(
         self,
         query: str,
         n_results: int = 5,
         semantic_weight: float = 0.7,
-        categories: List[str] = None
+        categories: List[str] = None,
+        query_embedding: List[float] = None
     ) -> List[Dict[str, Any]]:
 
         keyword_weight = 1 - semantic_weight
-        
+
         filter_metadata = None
         if categories and len(categories) > 0:
             if len(categories) == 1:
                 filter_metadata = {"category": categories[0]}
             else:
                 filter_metadata = {"$or": [{"category": cat} for cat in categories]}
-        
-        query_embedding = self.embedding_model.embed_text(query)
+
+        if query_embedding is None:
+            query_embedding = self.embedding_model.embed_text(query)
         semantic_results = self.vector_store.search(
             query_embedding=query_embedding,
             n_results=n_results * 2,
             filter_metadata=filter_metadata
         )
-        
-        tokenized_query = query.lower().split()
-        bm25_scores = self.bm25.get_scores(tokenized_query)
-        
+
+        tokenized_query = KeywordIndex.tokenize(query)
+        bm25_scores = self.keyword_index.get_scores(tokenized_query)
+        max_bm25 = max(bm25_scores.values(), default=0)
+        ids_by_content = self._ids_by_content
+
+        embeddings = semantic_results.get('embeddings') or [None] * len(semantic_results['ids'])
+
         results = []
-        for i, (doc, metadata, distance) in enumerate(zip(
+        for chunk_id, doc, metadata, distance, embedding in zip(
+            semantic_results['ids'],
             semantic_results['documents'],
             semantic_results['metadatas'],
-            semantic_results['distances']
-        )):
+            semantic_results['distances'],
+            embeddings
+        ):
             if categories and metadata.get('category') not in categories:
                 continue
 
-            chunk_idx = None
-            for idx, chunk in enumerate(self.chunks):
-                if chunk['content'] == doc and chunk['metadata'].get('source') == metadata.get('source'):
-                    chunk_idx = idx
-                    break
-            
+            # Collections built before deterministic IDs are matched by content
+            if chunk_id not in self.keyword_index:
+                chunk_id = ids_by_content.get((metadata.get('source'), doc), chunk_id)
+
             semantic_score = 1 - (distance / 2)
-            keyword_score = bm25_scores[chunk_idx] if chunk_idx is not None else 0
-            keyword_score = keyword_score / (max(bm25_scores) + 1e-6)
+            keyword_score = bm25_scores.get(chunk_id, 0)
+            keyword_score = keyword_score / (max_bm25 + 1e-6)
 
             combined_score = (
                 semantic_weight * semantic_score +
                 keyword_weight * keyword_score
             )
-            
+
             results.append({
+                'id': chunk_id,
                 'content': doc,
                 'metadata': metadata,
                 'score': combined_score,
                 'semantic_score': semantic_score,
-                'keyword_score': keyword_score
+                'keyword_score': keyword_score,
+                'embedding': embedding
             })
-        
+
         results.sort(key=lambda x: x['score'], reverse=True)
-        
-        return results[:n_results]
\ No newline at end of file
+
+        return results[:n_results]
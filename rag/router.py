@@ -0,0 +1,196 @@
+"""
+Query routing module for RAG chatbot
+"""
+
+import json
+import os
+import threading
+from typing import List, Dict, Any
+
+import numpy as np
+
+
+class QueryRouter:
+    """
+    Local relevance gate and category router.
+
+    Keeps one centroid per document category, built from the chunk embeddings
+    at ingest. A query embedding is compared with every centroid: if none is
+    close enough the question is treated as off-topic, otherwise the
+    categories close to the best match are returned so retrieval can search
+    narrower indexes.
+
+    Centroids are stored as per-source sums, so a file can be added, replaced
+    or removed (replace_source / remove_source) without rebuilding the rest.
+    With persist_path, the sums are saved there after every such change.
+    """
+
+    def __init__(
+        self,
+        relevance_threshold: float = 0.2,
+        route_margin: float = 0.05,
+        min_retrieval_score: float = 0.6,
+        persist_path: str = None
+    ):
+        self.relevance_threshold = relevance_threshold
+        self.route_margin = route_margin
+        # Compared with the best semantic_score from retrieval, (1 + cosine) / 2
+        self.min_retrieval_score = min_retrieval_score
+        self.persist_path = persist_path
+
+        self._lock = threading.Lock()
+        self._sources: Dict[str, Dict[str, Any]] = {}
+        self._centroids = ([], None)
+
+    def __len__(self) -> int:
+        return sum(entry['count'] for entry in self._sources.values())
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._sources)
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._centroids[0])
+
+    def _rebuild_centroids(self) -> None:
+        sums: Dict[str, np.ndarray] = {}
+        for entry in self._sources.values():
+            for category, vector_sum in entry['sums'].items():
+                sums[category] = sums.get(category, 0) + vector_sum
+
+        categories = sorted(sums)
+        if not categories:
+            self._centroids = ([], None)
+            return
+
+        centroids = np.stack([sums[category] for category in categories])
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._centroids = (categories, centroids / norms)
+
+    def _source_entry(self, chunks: List[Dict[str, Any]], embeddings: List[List[float]]) -> Dict[str, Any]:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+
+        sums: Dict[str, np.ndarray] = {}
+        for chunk, vector in zip(chunks, vectors):
+            category = chunk['metadata'].get('category', 'general')
+            sums[category] = sums.get(category, 0) + vector
+        return {'sums': sums, 'count': len(chunks)}
+
+    def replace_source(
+        self,
+        source: str,
+        chunks: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> None:
+        with self._lock:
+            if chunks:
+                self._sources[source] = self._source_entry(chunks, embeddings)
+            else:
+                self._sources.pop(source, None)
+            self._rebuild_centroids()
+        if self.persist_path:
+            self.save(self.persist_path)
+
+    def remove_source(self, source: str) -> None:
+        with self._lock:
+            self._sources.pop(source, None)
+            self._rebuild_centroids()
+        if self.persist_path:
+            self.save(self.persist_path)
+
+    def build_from_vector_store(self, vector_store, batch_size: int = 1000) -> None:
+        """Compute centroids from the embeddings already stored in Chroma"""
+        grouped: Dict[str, tuple] = {}
+        total = vector_store.get_count()
+        for offset in range(0, total, batch_size):
+            batch = vector_store.collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "metadatas"]
+            )
+            for embedding, metadata in zip(batch['embeddings'], batch['metadatas']):
+                chunks, embeddings = grouped.setdefault(metadata.get('source'), ([], []))
+                chunks.append({'metadata': metadata})
+                embeddings.append(embedding)
+
+        with self._lock:
+            self._sources = {
+                source: self._source_entry(chunks, embeddings)
+                for source, (chunks, embeddings) in grouped.items()
+            }
+            self._rebuild_centroids()
+        print(f"✓ Query router ready ({len(self.categories)} categories, {len(self)} chunks)")
+
+    def save(self, path: str) -> None:
+        # Written under the lock and swapped in whole, so concurrent updates
+        # can never leave an interleaved or truncated file behind
+        with self._lock:
+            data = {
+                source: {
+                    'count': entry['count'],
+                    'sums': {cat: vector_sum.tolist() for cat, vector_sum in entry['sums'].items()}
+                }
+                for source, entry in self._sources.items()
+            }
+            temp_path = path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, path)
+
+    def load(self, path: str) -> bool:
+        """Load saved centroids; returns False if there is no readable file"""
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read {path} ({e}), rebuilding router")
+            return False
+        with self._lock:
+            self._sources = {
+                source: {
+                    'count': entry['count'],
+                    'sums': {
+                        cat: np.asarray(vector_sum, dtype=np.float32)
+                        for cat, vector_sum in entry['sums'].items()
+                    }
+                }
+                for source, entry in data.items()
+            }
+            self._rebuild_centroids()
+        return True
+
+    def route(self, query_embedding: List[float]) -> Dict[str, Any]:
+        """
+        Score a query embedding against the category centroids
+
+        Returns whether the query looks relevant, the best centroid similarity,
+        per-category similarities and the categories worth searching.
+        """
+        categories, centroids = self._centroids
+        if centroids is None:
+            return {'relevant': True, 'best_score': None, 'scores': {}, 'categories': []}
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        similarities = centroids @ query
+
+        best = float(similarities.max())
+        scores = {category: float(sim) for category, sim in zip(categories, similarities)}
+        routed = [
+            category for category, sim in scores.items()
+            if sim >= best - self.route_margin
+        ]
+
+        return {
+            'relevant': best >= self.relevance_threshold,
+            'best_score': best,
+            'scores': scores,
+            'categories': sorted(routed, key=lambda c: -scores[c]),
+        }
@@ -0,0 +1,419 @@
+"""
+Sharded retrieval module for RAG chatbot
+"""
+
+import hashlib
+import heapq
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+from .chunker import make_chunk_id
+from .keyword_index import KeywordIndex
+from .vector_store import VectorStore
+
+
+# Shards open in this process, keyed by (persist_directory, collection_name).
+# Each worker process only ever opens the shard it is pinned to, and every
+# read and write of that shard goes through it, so its Chroma client and
+# keyword index always see the shard's latest state.
+_OPEN_SHARDS: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+
+def _shard_directory(persist_directory: str, collection_name: str) -> str:
+    """
+    Each shard gets its own Chroma directory: a PersistentClient is not
+    process-safe, so no two processes may open the same one
+    """
+    return os.path.join(persist_directory, collection_name)
+
+
+def _open_shard(persist_directory: str, collection_name: str) -> Dict[str, Any]:
+    key = (persist_directory, collection_name)
+    shard = _OPEN_SHARDS.get(key)
+    if shard is None:
+        store = VectorStore(
+            collection_name=collection_name,
+            persist_directory=_shard_directory(persist_directory, collection_name)
+        )
+        data = store.collection.get(include=["documents"])
+        keyword_index = KeywordIndex()
+        keyword_index.upsert(list(zip(data['ids'], data['documents'])))
+        shard = {'store': store, 'keyword_index': keyword_index}
+        _OPEN_SHARDS[key] = shard
+    return shard
+
+
+def _rebuild_shard(
+    persist_directory: str,
+    collection_name: str,
+    chunks: List[Dict[str, Any]],
+    embeddings: List[List[float]]
+) -> None:
+    shard = _open_shard(persist_directory, collection_name)
+    shard['store'].clear()
+    shard['keyword_index'] = KeywordIndex()
+    _replace_in_shard(persist_directory, collection_name, None, chunks, embeddings)
+
+
+def _replace_in_shard(
+    persist_directory: str,
+    collection_name: str,
+    source: Optional[str],
+    chunks: List[Dict[str, Any]],
+    embeddings: List[List[float]]
+) -> None:
+    """Upsert chunks, then drop the chunks of source that are not among them"""
+    shard = _open_shard(persist_directory, collection_name)
+    for chunk in chunks:
+        if not chunk.get('id'):
+            chunk['id'] = make_chunk_id(chunk['metadata'])
+
+    if chunks:
+        shard['store'].add_documents(chunks, embeddings)
+        shard['keyword_index'].upsert([(chunk['id'], chunk['content']) for chunk in chunks])
+
+    if source is not None:
+        new_ids = {chunk['id'] for chunk in chunks}
+        stale_ids = [i for i in shard['store'].get_source_ids(source) if i not in new_ids]
+        _delete_from_shard(persist_directory, collection_name, stale_ids)
+
+
+def _delete_from_shard(persist_directory: str, collection_name: str, ids: List[str]) -> None:
+    shard = _open_shard(persist_directory, collection_name)
+    found = shard['store'].collection.get(ids=ids, include=[])['ids'] if ids else []
+    if found:
+        shard['store'].delete_documents(found)
+        shard['keyword_index'].delete(found)
+
+
+def _shard_count(persist_directory: str, collection_name: str) -> int:
+    return _open_shard(persist_directory, collection_name)['store'].get_count()
+
+
+def _shard_term_stats(
+    persist_directory: str,
+    collection_name: str,
+    tokenized_query: List[str]
+) -> Tuple[int, int, Dict[str, int]]:
+    return _open_shard(persist_directory, collection_name)['keyword_index'].term_stats(tokenized_query)
+
+
+def _search_shard(
+    persist_directory: str,
+    collection_name: str,
+    query_embedding: Optional[List[float]],
+    tokenized_query: List[str],
+    n_results: int,
+    filter_metadata: Optional[Dict[str, Any]],
+    term_stats: Tuple[int, int, Dict[str, int]]
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Semantic search over one shard; runs inside the shard's worker process
+
+    Keyword scores are raw BM25 computed with the corpus-wide term_stats, so
+    they are comparable across shards. Also returns the shard's highest
+    keyword score, which the caller uses to normalise after merging. With no
+    query_embedding only that maximum is computed.
+    """
+    shard = _open_shard(persist_directory, collection_name)
+    keyword_scores = shard['keyword_index'].get_scores(tokenized_query, term_stats)
+    max_keyword_score = max(keyword_scores.values(), default=0.0)
+
+    count = shard['store'].get_count()
+    if query_embedding is None or count == 0:
+        return [], max_keyword_score
+
+    semantic_results = shard['store'].search(
+        query_embedding=query_embedding,
+        n_results=min(n_results * 2, count),
+        filter_metadata=filter_metadata
+    )
+
+    embeddings = semantic_results.get('embeddings') or [None] * len(semantic_results['ids'])
+
+    results = []
+    for chunk_id, doc, metadata, distance, embedding in zip(
+        semantic_results['ids'],
+        semantic_results['documents'],
+        semantic_results['metadatas'],
+        semantic_results['distances'],
+        embeddings
+    ):
+        results.append({
+            'id': chunk_id,
+            'content': doc,
+            'metadata': metadata,
+            'semantic_score': 1 - (distance / 2),
+            'keyword_score': keyword_scores.get(chunk_id, 0.0),
+            'embedding': embedding,
+            'shard': collection_name
+        })
+
+    return results, max_keyword_score
+
+
+class _Done:
+    """Already-finished stand-in for a Future when shards run in-process"""
+
+    def __init__(self, value: Any):
+        self._value = value
+
+    def result(self) -> Any:
+        return self._value
+
+
+class ShardedRetriever:
+    """
+    Hybrid retriever split over several shards, each with its own Chroma
+    collection and keyword index. Each shard lives in one worker process,
+    which serves both its searches and its writes. Shards are searched in
+    parallel and the per-shard top-k lists are merged; keyword scores use
+    corpus-wide statistics and are normalised after the merge, so results
+    match a single unsharded index.
+
+    shard_by:
+        hash:     chunks are spread over num_shards by a hash of source and chunk id
+        category: one shard per document category, so category filters only
+                  touch the shards they name
+    """
+
+    DEFAULT_CATEGORIES = ['healthcare', 'insurance', 'pharmaceutical', 'general']
+
+    def __init__(
+        self,
+        embedding_model,
+        num_shards: int = 4,
+        shard_by: str = "hash",
+        categories: List[str] = None,
+        persist_directory: str = "./chroma_db",
+        collection_prefix: str = "rag_documents",
+        use_processes: bool = True
+    ):
+        if shard_by not in ("hash", "category"):
+            raise ValueError("shard_by must be 'hash' or 'category'")
+
+        self.embedding_model = embedding_model
+        self.shard_by = shard_by
+        self.persist_directory = persist_directory
+
+        if shard_by == "category":
+            self.categories = categories or list(self.DEFAULT_CATEGORIES)
+            self.shard_names = [f"{collection_prefix}_{cat}" for cat in self.categories]
+        else:
+            if num_shards < 1:
+                raise ValueError("num_shards must be at least 1")
+            self.categories = None
+            self.shard_names = [f"{collection_prefix}_shard_{i}" for i in range(num_shards)]
+
+        self.num_shards = len(self.shard_names)
+        self._write_lock = threading.RLock()
+
+        # One single-worker pool per shard keeps each shard resident in exactly
+        # one process. "spawn" avoids forking a process that holds model threads.
+        self.executors = None
+        if use_processes:
+            context = multiprocessing.get_context("spawn")
+            self.executors = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context)
+                for _ in range(self.num_shards)
+            ]
+
+        print(f"✓ Sharded retriever ready ({self.num_shards} shards by {shard_by})")
+
+    def shard_for(self, chunk: Dict[str, Any]) -> int:
+        metadata = chunk['metadata']
+        if self.shard_by == "category":
+            category = metadata.get('category', 'general')
+            if category in self.categories:
+                return self.categories.index(category)
+            return self.categories.index('general') if 'general' in self.categories else 0
+
+        key = f"{metadata.get('source')}:{metadata.get('page')}:{metadata.get('chunk_id')}"
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+        return int(digest, 16) % self.num_shards
+
+    def _submit(self, shard_id: int, fn, *args):
+        """Run fn on the shard's own worker process (or inline without processes)"""
+        args = (self.persist_directory, self.shard_names[shard_id]) + args
+        if self.executors is None:
+            return _Done(fn(*args))
+        return self.executors[shard_id].submit(fn, *args)
+
+    def _on_shards(self, shard_ids: List[int], fn, *args) -> List[Any]:
+        futures = [self._submit(shard_id, fn, *args) for shard_id in shard_ids]
+        return [future.result() for future in futures]
+
+    def rebuild_shard(
+        self,
+        shard_id: int,
+        chunks: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> None:
+        """Replace the contents of one shard without touching the others"""
+        print(f"Rebuilding shard {self.shard_names[shard_id]} ({len(chunks)} chunks)...")
+        with self._write_lock:
+            self._submit(shard_id, _rebuild_shard, chunks, embeddings).result()
+
+    def _partition(self, chunks: List[Dict[str, Any]], embeddings: List[List[float]]):
+        if len(chunks) != len(embeddings):
+            raise ValueError("Number of chunks and embeddings must match")
+
+        partitions = [([], []) for _ in range(self.num_shards)]
+        for chunk, embedding in zip(chunks, embeddings):
+            shard_chunks, shard_embeddings = partitions[self.shard_for(chunk)]
+            shard_chunks.append(chunk)
+            shard_embeddings.append(embedding)
+        return partitions
+
+    def build(self, chunks: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+        partitions = self._partition(chunks, embeddings)
+        for shard_id, (shard_chunks, shard_embeddings) in enumerate(partitions):
+            self.rebuild_shard(shard_id, shard_chunks, shard_embeddings)
+
+    @staticmethod
+    def _iter_vector_store(vector_store: VectorStore, batch_size: int):
+        """Batches of (chunks, embeddings) from a Chroma-backed VectorStore"""
+        total = vector_store.get_count()
+        for offset in range(0, total, batch_size):
+            batch = vector_store.collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            chunks = [
+                {'content': doc, 'metadata': metadata}
+                for doc, metadata in zip(batch['documents'], batch['metadatas'])
+            ]
+            yield chunks, batch['embeddings']
+
+    def _write(self, source: Optional[str], chunks, embeddings) -> None:
+        partitions = self._partition(chunks, embeddings)
+        with self._write_lock:
+            futures = [
+                self._submit(shard_id, _replace_in_shard, source, shard_chunks, shard_embeddings)
+                for shard_id, (shard_chunks, shard_embeddings) in enumerate(partitions)
+                if shard_chunks or source is not None
+            ]
+            for future in futures:
+                future.result()
+
+    def add_chunks(self, chunks: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+        """Add or update chunks in their shards; each shard updates its indexes in place"""
+        self._write(None, chunks, embeddings)
+
+    def delete_chunks(self, ids: List[str]) -> None:
+        with self._write_lock:
+            self._on_shards(range(self.num_shards), _delete_from_shard, ids)
+
+    def replace_source(
+        self,
+        source: str,
+        chunks: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> None:
+        """Swap in the new chunks of a changed file and drop the ones it no longer has"""
+        self._write(source, chunks, embeddings)
+
+    def remove_source(self, source: str) -> None:
+        self._write(source, [], [])
+
+    def build_from_vector_store(self, vector_store: VectorStore, batch_size: int = 1000) -> None:
+        """
+        Split an existing single collection into shards, reusing its embeddings
+
+        Batches are streamed to the shards one at a time, so the corpus never
+        has to fit in this process.
+        """
+        with self._write_lock:
+            for shard_id in range(self.num_shards):
+                self.rebuild_shard(shard_id, [], [])
+            for chunks, embeddings in self._iter_vector_store(vector_store, batch_size):
+                self._write(None, chunks, embeddings)
+
+    def rebuild_shard_from_vector_store(
+        self,
+        shard_id: int,
+        vector_store: VectorStore,
+        batch_size: int = 1000
+    ) -> None:
+        """Rebuild one shard from the single collection, keeping only the chunks that map to it"""
+        with self._write_lock:
+            self.rebuild_shard(shard_id, [], [])
+            for chunks, embeddings in self._iter_vector_store(vector_store, batch_size):
+                shard_chunks, shard_embeddings = self._partition(chunks, embeddings)[shard_id]
+                if shard_chunks:
+                    self._submit(
+                        shard_id, _replace_in_shard, None, shard_chunks, shard_embeddings
+                    ).result()
+
+    def get_count(self) -> int:
+        return sum(self._on_shards(range(self.num_shards), _shard_count))
+
+    def retrieve(
+        self,
+        query: str,
+        n_results: int = 5,
+        semantic_weight: float = 0.7,
+        categories: List[str] = None,
+        query_embedding: List[float] = None
+    ) -> List[Dict[str, Any]]:
+
+        shard_ids = list(range(self.num_shards))
+        filter_metadata = None
+        if categories:
+            if self.shard_by == "category":
+                shard_ids = [self.categories.index(cat) for cat in categories if cat in self.categories]
+            elif len(categories) == 1:
+                filter_metadata = {"category": categories[0]}
+            else:
+                filter_metadata = {"$or": [{"category": cat} for cat in categories]}
+
+        if query_embedding is None:
+            query_embedding = self.embedding_model.embed_text(query)
+        tokenized_query = KeywordIndex.tokenize(query)
+
+        # Document frequencies summed over every shard, so BM25 is scored as
+        # if the corpus were one index
+        all_shards = range(self.num_shards)
+        term_stats = [0, 0, {term: 0 for term in set(tokenized_query)}]
+        for num_docs, total_length, dfs in self._on_shards(all_shards, _shard_term_stats, tokenized_query):
+            term_stats[0] += num_docs
+            term_stats[1] += total_length
+            for term, df in dfs.items():
+                term_stats[2][term] += df
+        term_stats = tuple(term_stats)
+
+        # Shards outside the category filter still report their best keyword
+        # score, which a single index would normalise against
+        futures = [
+            self._submit(
+                shard_id, _search_shard,
+                query_embedding if shard_id in shard_ids else None,
+                tokenized_query, n_results, filter_metadata, term_stats
+            )
+            for shard_id in all_shards
+        ]
+        shard_results = [future.result() for future in futures]
+
+        max_keyword_score = max((shard_max for _, shard_max in shard_results), default=0.0)
+        keyword_weight = 1 - semantic_weight
+
+        merged = []
+        for results, _ in shard_results:
+            for result in results:
+                result['keyword_score'] = result['keyword_score'] / (max_keyword_score + 1e-6)
+                result['score'] = (
+                    semantic_weight * result['semantic_score'] +
+                    keyword_weight * result['keyword_score']
+                )
+                merged.append(result)
+        return heapq.nlargest(n_results, merged, key=lambda x: x['score'])
+
+    def close(self) -> None:
+        if self.executors is not None:
+            for executor in self.executors:
+                executor.shutdown()
+            self.executors = None
@@ -5,7 +5,8 @@ Vector store module for RAG chatbot
 from typing import List, Dict, Any, Optional
 import chromadb
 from chromadb.config import Settings
-import uuid
+
+from .chunker import make_chunk_id
 
 
 class VectorStore:
@@ -14,6 +15,7 @@ class VectorStore:
 
         print(f"Initializing ChromaDB at {persist_directory}...")
         
+        self.persist_directory = persist_directory
         self.client = chromadb.PersistentClient(path=persist_directory)
 
         self.collection = self.client.get_or_create_collection(
@@ -31,7 +33,8 @@ class VectorStore:
         if len(chunks) != len(embeddings):
             raise ValueError("Number of chunks and embeddings must match")
         
-        ids = [str(uuid.uuid4()) for _ in chunks]
+        # Deterministic IDs, so adding a chunk again updates it instead of duplicating it
+        ids = [chunk.get('id') or make_chunk_id(chunk['metadata']) for chunk in chunks]
         documents = [chunk['content'] for chunk in chunks]
         metadatas = [chunk['metadata'] for chunk in chunks]
         
@@ -41,7 +44,7 @@ class VectorStore:
         for i in range(0, len(chunks), batch_size):
             end_idx = min(i + batch_size, len(chunks))
             
-            self.collection.add(
+            self.collection.upsert(
                 ids=ids[i:end_idx],
                 documents=documents[i:end_idx],
                 embeddings=embeddings[i:end_idx],
@@ -65,17 +68,48 @@ class VectorStore:
         results = self.collection.query(
             query_embeddings=[query_embedding],
             n_results=n_results,
-            where=where_clause
+            where=where_clause,
+            include=["documents", "metadatas", "distances", "embeddings"]
         )
         
         formatted_results = {
+            'ids': results['ids'][0] if results['ids'] else [],
             'documents': results['documents'][0] if results['documents'] else [],
             'metadatas': results['metadatas'][0] if results['metadatas'] else [],
             'distances': results['distances'][0] if results['distances'] else [],
+            'embeddings': results['embeddings'][0] if results.get('embeddings') else [],
         }
         
         return formatted_results
     
+    def delete_documents(self, ids: List[str]) -> None:
+        if ids:
+            self.collection.delete(ids=ids)
+    
+    def get_source_ids(self, source: str) -> List[str]:
+        return self.collection.get(where={"source": source}, include=[])['ids']
+    
+    def delete_source(self, source: str) -> List[str]:
+        """Delete every chunk of one source file and return their IDs"""
+        ids = self.get_source_ids(source)
+        self.delete_documents(ids)
+        return ids
+    
+    def replace_source(
+        self,
+        source: str,
+        chunks: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> None:
+        """Upsert the chunks of a changed file and delete the ones it no longer has"""
+        new_ids = {chunk.get('id') or make_chunk_id(chunk['metadata']) for chunk in chunks}
+        if chunks:
+            self.add_documents(chunks, embeddings)
+        self.delete_documents([i for i in self.get_source_ids(source) if i not in new_ids])
+    
+    def remove_source(self, source: str) -> None:
+        self.delete_source(source)
+    
     def get_count(self) -> int:
         return self.collection.count()
     
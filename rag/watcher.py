@@ -0,0 +1,287 @@
+"""
+Watch-folder ingestion module for RAG chatbot
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Iterable
+
+from .document_loader import DocumentLoader
+from .chunker import TextChunker
+
+
+class DocumentWatcher:
+    """
+    Background service that polls a documents directory and keeps running
+    retrievers in sync with it.
+
+    New, changed and removed files are detected by comparing modification
+    time and size between polls. A file is only processed once it has been
+    quiet for debounce_seconds, so a burst of writes (a large copy, an editor
+    saving several times) results in one update. Extraction, chunking and
+    embedding run in a worker pool, and the result is published to every
+    subscribed retriever through replace_source / remove_source.
+
+    With state_path, the version of every file in the index is saved after
+    each update, and on start-up any file that was added, changed or removed
+    while the watcher was not running is queued. Files with no saved state
+    whose source is in indexed_sources are taken as already indexed.
+
+    A file that fails to process (still locked, unreadable, an index error)
+    is queued again with exponential backoff, up to max_retries times.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        embedding_model,
+        retrievers: List[Any] = None,
+        chunker: TextChunker = None,
+        poll_interval: float = 2.0,
+        debounce_seconds: float = 3.0,
+        max_workers: int = 2,
+        index_existing: bool = False,
+        indexed_sources: Iterable[str] = None,
+        state_path: str = None,
+        max_retries: int = 5,
+        max_retry_seconds: float = 300.0
+    ):
+        self.directory = directory
+        self.embedding_model = embedding_model
+        self.retrievers = list(retrievers or [])
+        self.chunker = chunker or TextChunker()
+        self.poll_interval = poll_interval
+        self.debounce_seconds = debounce_seconds
+        self.max_retries = max_retries
+        self.max_retry_seconds = max_retry_seconds
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.max_workers = max_workers
+        self._executor = None
+
+        self.state_path = state_path
+        # path -> (mtime, size) of the version currently in the index
+        self._indexed: Dict[str, Tuple[float, int]] = self._load_state()
+        self._known: Dict[str, Tuple[float, int]] = self._initial_known(index_existing, indexed_sources)
+
+        # path -> change waiting for its debounce window
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # path -> change currently being processed
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+
+        # Bumped after every published update, so caches of retrieved chunks
+        # can tell they may be stale
+        self.version = 0
+
+        self._stats = {
+            'processed': 0,
+            'failed': 0,
+            'last_error': None,
+            'last_lag_seconds': 0.0,
+            'last_processed_at': None,
+        }
+
+    def _load_state(self) -> Dict[str, Tuple[float, int]]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return {path: tuple(signature) for path, signature in json.load(f).items()}
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._indexed, f)
+        os.replace(temp_path, self.state_path)
+
+    def _initial_known(self, index_existing: bool, indexed_sources) -> Dict[str, Tuple[float, int]]:
+        """What the first poll compares against; anything that differs gets queued"""
+        current = self._scan()
+        if index_existing:
+            return {}
+        if indexed_sources is None and not self.state_path:
+            # Nothing to compare against, so files already present are assumed indexed
+            return current
+
+        indexed_sources = set(indexed_sources) if indexed_sources is not None else None
+
+        def in_index(file_path: str) -> bool:
+            return indexed_sources is None or os.path.basename(file_path) in indexed_sources
+
+        # Saved files missing from disk show up as removed, changed ones as changed
+        known = {
+            file_path: signature for file_path, signature in self._indexed.items()
+            if file_path not in current or in_index(file_path)
+        }
+        for file_path, signature in current.items():
+            if file_path not in known and indexed_sources is not None and in_index(file_path):
+                known[file_path] = signature
+                self._indexed[file_path] = signature
+        self._save_state()
+        return known
+
+    def subscribe(self, retriever) -> None:
+        with self._lock:
+            self.retrievers.append(retriever)
+
+    def _scan(self) -> Dict[str, Tuple[float, int]]:
+        files = {}
+        path = Path(self.directory)
+        if not path.exists():
+            return files
+        for file_path in path.rglob('*'):
+            if file_path.is_file() and file_path.suffix.lower() in DocumentLoader.SUPPORTED_EXTENSIONS:
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    continue
+                files[str(file_path)] = (stat.st_mtime, stat.st_size)
+        return files
+
+    def poll(self) -> None:
+        """Detect changes since the last poll and dispatch files whose debounce window has passed"""
+        if self._executor is None:
+            raise RuntimeError("DocumentWatcher is not running")
+        now = time.time()
+        current = self._scan()
+
+        with self._lock:
+            changed = [p for p, sig in current.items() if self._known.get(p) != sig]
+            removed = [p for p in self._known if p not in current]
+
+            for file_path in changed:
+                self._record_change(file_path, 'upsert', now, current[file_path])
+            for file_path in removed:
+                self._record_change(file_path, 'delete', now)
+            self._known = current
+
+            ready = [
+                file_path for file_path, change in self._pending.items()
+                if now - change['last_changed'] >= self.debounce_seconds
+                and now >= change.get('retry_at', 0)
+                and file_path not in self._in_flight
+            ]
+            for file_path in ready:
+                change = self._pending.pop(file_path)
+                self._in_flight[file_path] = change
+                self._executor.submit(self._process, file_path, change)
+
+    def _record_change(self, file_path: str, kind: str, now: float, signature=None) -> None:
+        change = self._pending.get(file_path)
+        if change is None:
+            self._pending[file_path] = {
+                'kind': kind, 'signature': signature, 'detected_at': now, 'last_changed': now
+            }
+        else:
+            change['kind'] = kind
+            change['signature'] = signature
+            change['last_changed'] = now
+
+    def _process(self, file_path: str, change: Dict[str, Any]) -> None:
+        source = os.path.basename(file_path)
+        try:
+            if change['kind'] == 'delete':
+                print(f"Removing {source} from index...")
+                for retriever in list(self.retrievers):
+                    retriever.remove_source(source)
+                print(f"✓ {source} removed")
+            else:
+                print(f"Indexing {source}...")
+                docs = DocumentLoader.load_file(file_path)
+                chunks = self.chunker.chunk_documents(docs)
+                if not chunks:
+                    # The loaders return nothing for files they can't read (still
+                    # being copied, locked, corrupt), so keep the indexed version
+                    raise ValueError("no text could be extracted")
+                embeddings = self.embedding_model.embed_batch(
+                    [chunk['content'] for chunk in chunks]
+                )
+                for retriever in list(self.retrievers):
+                    retriever.replace_source(source, chunks, embeddings)
+                print(f"✓ {source} indexed ({len(chunks)} chunks)")
+
+            with self._lock:
+                if change['kind'] == 'delete':
+                    self._indexed.pop(file_path, None)
+                else:
+                    self._indexed[file_path] = change['signature']
+                self._save_state()
+                self.version += 1
+                self._stats['processed'] += 1
+                self._stats['last_lag_seconds'] = time.time() - change['detected_at']
+                self._stats['last_processed_at'] = time.time()
+        except Exception as e:
+            print(f"Error indexing {file_path}: {e}")
+            with self._lock:
+                self._stats['failed'] += 1
+                self._stats['last_error'] = f"{source}: {e}"
+                self._schedule_retry(file_path, change)
+        finally:
+            with self._lock:
+                self._in_flight.pop(file_path, None)
+
+    def _schedule_retry(self, file_path: str, change: Dict[str, Any]) -> None:
+        # A newer change to the same file supersedes the failed one
+        if file_path in self._pending:
+            return
+        attempts = change.get('attempts', 0) + 1
+        if attempts > self.max_retries:
+            print(f"Giving up on {file_path} until it changes again")
+            return
+        delay = min(self.poll_interval * 2 ** attempts, self.max_retry_seconds)
+        self._pending[file_path] = dict(change, attempts=attempts, retry_at=time.time() + delay)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Queue depth and lag for monitoring
+
+        queue_depth counts files waiting for their debounce window or being
+        processed; lag_seconds is the age of the oldest of those changes.
+        """
+        now = time.time()
+        with self._lock:
+            waiting = list(self._pending.values()) + list(self._in_flight.values())
+            oldest = min((change['detected_at'] for change in waiting), default=None)
+            return {
+                'queue_depth': len(waiting),
+                'pending': len(self._pending),
+                'in_flight': len(self._in_flight),
+                'lag_seconds': now - oldest if oldest is not None else 0.0,
+                'watched_files': len(self._known),
+                **self._stats,
+            }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error watching {self.directory}: {e}")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        print(f"Watching {self.directory} for new documents...")
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="ingest"
+        )
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="document-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._executor.shutdown(wait=True)
+        self._executor = None